@@ -11,22 +11,33 @@ Endpoints:
 """
 
 import asyncio
-import json
+import functools
 import logging
 import os
+import secrets
 from typing import List, Optional, Dict, Any
-import math
+import re
+from decimal import Decimal
 
-from openai import OpenAI
-from fastapi import FastAPI, HTTPException, Query, Depends
+import asyncpg
+import httpx
+import orjson
+from rapidfuzz import fuzz, process, utils
+from openai import AsyncOpenAI
+from fastapi import FastAPI, HTTPException, Query, Depends, Header, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from sqlalchemy import select, func, and_, or_
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, Field, TypeAdapter
+from sqlalchemy import select, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import selectinload
 
-from models import Base, Provider, Procedure, ProviderProcedure, Rating
-from database_config import get_database_url
+from models import Procedure
+from database_config import get_database_url, get_readonly_database_url
+import geo
+from geo import get_zip_coordinates
+from cache import LRUCache, RedisCache, REDIS_URL, normalize_question, hash_key
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -36,7 +47,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Healthcare Pricing API",
     description="API for searching healthcare providers and AI-powered queries",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -52,8 +64,50 @@ app.add_middleware(
 engine = None
 session_factory = None
 
-# OpenAI setup
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Raw asyncpg pool for the hot /providers query; SQLAlchemy serves everything else
+pg_pool: Optional[asyncpg.Pool] = None
+
+# /ask results are buffered only when the query's own LIMIT keeps them small;
+# anything else is streamed from a server-side cursor
+MAX_BUFFERED_ROWS = 1000
+STREAM_PARTITION_SIZE = 1000
+TRAILING_LIMIT_RE = re.compile(r"\blimit\s+(\d+)(?:\s+offset\s+\d+)?\s*;?\s*$", re.IGNORECASE)
+
+# Procedure lookup, loaded at startup since procedures only change when the ETL runs
+procedure_ids_by_code: Dict[str, int] = {}  # ms_drg_code -> procedures.id
+procedures_by_id: Dict[int, tuple] = {}  # procedures.id -> (ms_drg_code, ms_drg_description)
+
+# Fuzzy description index over the same rows; parallel lists of preprocessed
+# descriptions and their procedure ids
+procedure_descriptions: List[str] = []
+procedure_description_ids: List[int] = []
+DRG_MATCH_SCORE_CUTOFF = 85
+DRG_MATCH_SCORE_MARGIN = 2
+DRG_MATCH_LIMIT = 20
+
+# Read-only database setup for executing AI-generated SQL
+readonly_engine = None
+readonly_session_factory = None
+
+# SQLSTATEs Postgres raises when a read-only session or role attempts a write
+READ_ONLY_VIOLATIONS = {
+    "25006",  # read_only_sql_transaction
+    "42501",  # insufficient_privilege
+}
+
+# OpenAI setup; created at startup on a shared HTTP/2 connection pool
+http_client: Optional[httpx.AsyncClient] = None
+client: Optional[AsyncOpenAI] = None
+
+# Cache setup
+ASK_CACHE_TTL = 3600  # seconds
+PROVIDERS_CACHE_TTL = 3600  # seconds
+
+# Shared secret for the /admin endpoints; they are refused while it is unset
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+sql_cache = LRUCache(maxsize=1024)  # normalized question -> generated SQL
+sql_inflight: Dict[str, asyncio.Task] = {}  # normalized question -> running completion
+response_cache: Optional[RedisCache] = None  # enabled when REDIS_URL is set
 
 # Pydantic schemas
 class ProviderSearchRequest(BaseModel):
@@ -76,6 +130,9 @@ class ProviderResponse(BaseModel):
     average_medicare_payments: float
     rating: Optional[int] = None
 
+# Validates and serializes a whole /providers page in one pydantic-core pass
+PROVIDERS_ADAPTER = TypeAdapter(List[ProviderResponse])
+
 class AskRequest(BaseModel):
     question: str = Field(..., description="Natural language question about healthcare data")
 
@@ -86,95 +143,304 @@ class AskResponse(BaseModel):
     message: str
 
 # Database dependency
-async def get_db():
-    """Get database session"""
-    async with session_factory() as session:
+async def get_readonly_db():
+    """Get read-only database session"""
+    if readonly_session_factory is None:
+        # Fail closed rather than run generated SQL as the main role
+        raise HTTPException(
+            status_code=503,
+            detail="The AI assistant is disabled: READONLY_DATABASE_URL must name a dedicated read-only role"
+        )
+    async with readonly_session_factory() as session:
         try:
             yield session
         finally:
             await session.close()
 
+async def require_admin_token(x_admin_token: Optional[str] = Header(None)):
+    """Reject requests whose X-Admin-Token header does not match ADMIN_TOKEN"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled: ADMIN_TOKEN is not set")
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid or missing X-Admin-Token header")
+
 # Helper functions
-def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    """Calculate distance between two points using Haversine formula"""
-    R = 6371  # Earth's radius in kilometers
+def cached(namespace: str, ttl: int, key_builder):
+    """
+    Cache an endpoint's JSON response in Redis under "<namespace>:<key_builder(**kwargs)>".
     
-    dlat = math.radians(lat2 - lat1)
-    dlon = math.radians(lon2 - lon1)
+    Hits are returned as the stored bytes without touching the database. When
+    Redis is not configured the endpoint runs uncached.
+    """
+    def decorator(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(**kwargs):
+            if response_cache is None:
+                return await endpoint(**kwargs)
+            
+            key = f"{namespace}:{key_builder(**kwargs)}"
+            payload = await response_cache.get_raw(key)
+            if payload is None:
+                result = await endpoint(**kwargs)
+                payload = result.body if isinstance(result, Response) else orjson.dumps(result)
+                await response_cache.set_raw(key, payload, ttl=ttl)
+            return Response(content=payload, media_type="application/json")
+        return wrapper
+    return decorator
+
+def match_procedure_descriptions(drg: str) -> List[int]:
+    """
+    Resolve a free-text DRG description to candidate procedure ids.
     
-    a = (math.sin(dlat/2) * math.sin(dlat/2) + 
-         math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * 
-         math.sin(dlon/2) * math.sin(dlon/2))
+    Every description containing the search text matches, as ILIKE did.
+    Only when nothing contains it are fuzzy partial_ratio matches used
+    instead, so small typos ("hart failure", "pnemonia") still find their
+    procedure. Of those, only matches scoring at least DRG_MATCH_SCORE_CUTOFF
+    and within DRG_MATCH_SCORE_MARGIN of the best one are kept, which drops
+    nearby but unrelated DRGs.
+    """
+    query = utils.default_process(drg)
+    if not query:
+        return []
     
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-    return R * c
-
-async def get_zip_coordinates(zip_code: str) -> Optional[tuple]:
-    """Get coordinates for a ZIP code (simplified - in production, use a proper geocoding service)"""
-    # This is a simplified implementation
-    # In production, you'd use a service like Google Geocoding API or a ZIP code database
-    zip_coords = {
-        "10001": (40.7505, -73.9934),  # NYC
-        "10002": (40.7174, -73.9897),  # NYC
-        "10003": (40.7323, -73.9894),  # NYC
-        "11201": (40.6943, -73.9903),  # Brooklyn
-        "11215": (40.6622, -73.9874),  # Brooklyn
-        "10451": (40.8200, -73.9200),  # Bronx
-        "11101": (40.7505, -73.9400),  # Queens
-        "10301": (40.6415, -74.0776),  # Staten Island
-    }
-    return zip_coords.get(zip_code)
+    ids = [
+        procedure_description_ids[i]
+        for i, description in enumerate(procedure_descriptions)
+        if query in description
+    ]
+    if ids:
+        return ids
+    
+    matches = process.extract(
+        query,
+        procedure_descriptions,
+        scorer=fuzz.partial_ratio,
+        processor=None,
+        score_cutoff=DRG_MATCH_SCORE_CUTOFF,
+        limit=DRG_MATCH_LIMIT
+    )
+    if not matches:
+        return []
+    best_score = matches[0][1]
+    return list(dict.fromkeys(
+        procedure_description_ids[i] for _, score, i in matches
+        if score >= best_score - DRG_MATCH_SCORE_MARGIN
+    ))
 
-async def generate_sql_from_question(question: str) -> str:
-    """Use OpenAI to convert natural language question to SQL query"""
-    system_prompt = """
-        You are a SQL expert for a healthcare pricing database. Convert natural language questions into SQL queries.
-        
-        Database schema:
-        - providers: provider_id, provider_name, provider_city, provider_state, provider_zip_code
-        - procedures: id, ms_drg_code, ms_drg_description  
-        - provider_procedures: provider_id, procedure_id, total_discharges, average_covered_charges, average_total_payments, average_medicare_payments
-        - ratings: provider_id, rating (1-10 scale)
-        
-        Rules:
-        1. Always use JOINs to get complete data
-        2. Use ILIKE for text searches
-        3. Return only the SQL query, no explanations
-        4. Use proper table aliases (p for providers, pr for procedures, pp for provider_procedures, r for ratings)
-        5. For cost queries, use average_total_payments
-        6. For quality queries, use ratings.rating
-        7. Always include provider_name and relevant procedure info in SELECT
-        """
-        
-    # Use asyncio.to_thread to call synchronous client in async function
+def build_providers_query(
+    drg: Optional[str],
+    procedure_ids: Optional[List[int]],
+    target_coords: Optional[tuple],
+    radius_km: Optional[float],
+    limit: int,
+    offset: int
+) -> tuple:
+    """
+    Build the raw /providers SQL and its positional parameters.
+    
+    Every filter, including the radius, is applied in SQL before LIMIT /
+    OFFSET, so each page holds exactly the matching rows. Each combination
+    of filters produces its own fixed statement text, so asyncpg's
+    statement cache keeps one prepared plan per query shape.
+    When procedure_ids is given the procedures join is skipped: rows carry
+    procedure_id and the caller fills in ms_drg_code / ms_drg_description.
+    Otherwise drg is matched on the joined procedures table, by code or by
+    ILIKE on the description.
+    """
+    params = []
+    
+    def param(value, pg_type):
+        params.append(value)
+        return f"${len(params)}::{pg_type}"
+    
+    where = []
+    if target_coords:
+        target_point = f"ll_to_earth({param(target_coords[0], 'float8')}, {param(target_coords[1], 'float8')})"
+        radius_m = param(radius_km * 1000, "float8")
+        distance_m = f"earth_distance({target_point}, ll_to_earth(p.latitude, p.longitude))"
+        distance_column = f"round(({distance_m} / 1000.0)::numeric, 2)::float8"
+        # earth_box is served by the GiST index; earth_distance trims the box
+        # corners down to the exact radius. Providers the ETL could not
+        # geocode have no coordinates and cannot be placed in a radius
+        where.append("p.latitude IS NOT NULL")
+        where.append(f"earth_box({target_point}, {radius_m}) @> ll_to_earth(p.latitude, p.longitude)")
+        where.append(f"{distance_m} <= {radius_m}")
+    else:
+        distance_column = "NULL::float8"
+    
+    if procedure_ids is not None:
+        procedure_columns = "pp.procedure_id,"
+        procedure_join = ""
+        where.append(f"pp.procedure_id = ANY({param(procedure_ids, 'int4[]')})")
+    else:
+        procedure_columns = "pr.ms_drg_code, pr.ms_drg_description,"
+        procedure_join = "JOIN procedures pr ON pr.id = pp.procedure_id"
+        if drg:
+            if drg.isdigit():
+                where.append(f"pr.ms_drg_code = {param(drg, 'text')}")
+            else:
+                # Served by the procedures_desc_trgm index
+                where.append(f"pr.ms_drg_description ILIKE {param(f'%{drg}%', 'text')}")
+    
+    where_clause = f"WHERE {' AND '.join(where)}" if where else ""
+    
+    # Columns match ProviderResponse so rows convert directly
+    sql = f"""
+        SELECT
+            p.provider_id, p.provider_name, p.provider_city, p.provider_state, p.provider_zip_code,
+            {distance_column} AS distance_km,
+            {procedure_columns}
+            pp.total_discharges, pp.average_covered_charges,
+            pp.average_total_payments, pp.average_medicare_payments,
+            r.rating
+        FROM providers p
+        JOIN provider_procedures pp ON pp.provider_id = p.provider_id
+        {procedure_join}
+        LEFT JOIN ratings r ON r.provider_id = p.provider_id
+        {where_clause}
+        ORDER BY p.provider_id, pp.procedure_id
+        LIMIT {param(limit, 'int8')} OFFSET {param(offset, 'int8')}
+    """
+    return sql, params
 
-    await asyncio.sleep(2)
+SQL_SYSTEM_PROMPT = """
+    You are a SQL expert for a healthcare pricing database. Convert natural language questions into SQL queries.
+    
+    Database schema:
+    - providers: provider_id, provider_name, provider_city, provider_state, provider_zip_code
+    - procedures: id, ms_drg_code, ms_drg_description  
+    - provider_procedures: provider_id, procedure_id, total_discharges, average_covered_charges, average_total_payments, average_medicare_payments
+    - ratings: provider_id, rating (1-10 scale)
+    
+    Rules:
+    1. Always use JOINs to get complete data
+    2. Use ILIKE for text searches
+    3. Return only the SQL query, no explanations
+    4. Use proper table aliases (p for providers, pr for procedures, pp for provider_procedures, r for ratings)
+    5. For cost queries, use average_total_payments
+    6. For quality queries, use ratings.rating
+    7. Always include provider_name and relevant procedure info in SELECT
+    """
 
-    response = await asyncio.to_thread(
-    lambda: client.chat.completions.create(
+async def complete_sql(question: str) -> str:
+    """Ask OpenAI for the SQL query answering one question"""
+    response = await client.chat.completions.create(
         model="gpt-4o-mini",
         messages=[
-            {"role": "system", "content": system_prompt},
+            {"role": "system", "content": SQL_SYSTEM_PROMPT},
             {"role": "user", "content": question}
         ],
         max_tokens=500,
         temperature=0.1
     )
-    )
-
     return response.choices[0].message.content.strip()
 
+async def complete_and_cache_sql(cache_key: str, question: str) -> str:
+    """Generate SQL for a question and memoize it under its normalized form"""
+    sql_query = await complete_sql(question)
+    sql_cache.set(cache_key, sql_query)
+    return sql_query
+
+async def generate_sql_from_question(question: str) -> str:
+    """Use OpenAI to convert natural language question to SQL query
+
+    Generated SQL is memoized per normalized question so repeated questions
+    skip the OpenAI call entirely. A question that is already being generated
+    awaits the running completion instead of starting a second one.
+    """
+    cache_key = normalize_question(question)
+    cached_sql = sql_cache.get(cache_key)
+    if cached_sql is not None:
+        return cached_sql
+
+    task = sql_inflight.get(cache_key)
+    if task is None:
+        task = asyncio.create_task(complete_and_cache_sql(cache_key, question))
+        sql_inflight[cache_key] = task
+        task.add_done_callback(lambda _: sql_inflight.pop(cache_key, None))
+    # A disconnecting client must not cancel the completion others are awaiting
+    return await asyncio.shield(task)
+
+def is_bounded_query(sql_query: str) -> bool:
+    """Whether the query ends with a LIMIT small enough to buffer the full result"""
+    match = TRAILING_LIMIT_RE.search(sql_query)
+    return match is not None and int(match.group(1)) <= MAX_BUFFERED_ROWS
+
+def raw_sql(sql_query: str):
+    """Wrap literal SQL in text() with colons escaped so none are read as bind parameters"""
+    return text(sql_query.replace(":", "\\:"))
+
+def json_default(value):
+    """orjson fallback for types it does not serialize natively"""
+    if isinstance(value, Decimal):
+        # Same representation the buffered path gets from pydantic
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+async def stream_ask_response(session: AsyncSession, result, question: str, sql_query: str):
+    """
+    Yield an AskResponse-shaped JSON document, reading rows from a server-side
+    cursor one partition at a time. Owns (and closes) the session.
+    """
+    count = 0
+    message = None
+    try:
+        yield (
+            b'{"question":' + orjson.dumps(question)
+            + b',"sql_query":' + orjson.dumps(sql_query)
+            + b',"results":['
+        )
+        async for partition in result.partitions(STREAM_PARTITION_SIZE):
+            chunk = b",".join(
+                orjson.dumps(dict(row._mapping), default=json_default) for row in partition
+            )
+            yield (b"," if count else b"") + chunk
+            count += len(partition)
+        message = f"Found {count} results for your query."
+    except Exception as e:
+        # Headers are already sent, so end the document instead of failing the request
+        logger.error(f"SQL streaming error after {count} rows: {e}")
+        message = f"Results were truncated after {count} rows because of an error."
+    finally:
+        await result.close()
+        await session.close()
+    yield b'],"message":' + orjson.dumps(message) + b"}"
+
+async def load_procedure_index():
+    """Load the procedures table into the in-memory lookup dictionaries"""
+    global procedure_ids_by_code, procedures_by_id, procedure_descriptions, procedure_description_ids
+    
+    async with session_factory() as session:
+        result = await session.execute(
+            select(Procedure.id, Procedure.ms_drg_code, Procedure.ms_drg_description)
+        )
+        rows = result.fetchall()
+    
+    by_id = {row.id: (row.ms_drg_code, row.ms_drg_description) for row in rows}
+    # procedures.ms_drg_code is unique, so each code maps to one id
+    ids_by_code = {ms_drg_code: procedure_id for procedure_id, (ms_drg_code, _) in by_id.items()}
+    
+    procedures_by_id, procedure_ids_by_code = by_id, ids_by_code
+    procedure_description_ids = list(by_id)
+    procedure_descriptions = [utils.default_process(by_id[i][1] or "") for i in procedure_description_ids]
+    logger.info(f"Loaded {len(by_id)} procedures into the lookup index")
+
 # Startup event
 @app.on_event("startup")
 async def startup_event():
     """Initialize database connection"""
-    global engine, session_factory
+    global engine, session_factory, pg_pool, readonly_engine, readonly_session_factory, response_cache
+    global http_client, client
     
     try:
         database_url = get_database_url(async_driver=True)
+        # Only load_procedure_index uses the SQLAlchemy engine; /providers
+        # queries go through pg_pool
         engine = create_async_engine(
             database_url,
             echo=False,
+            pool_size=1,
+            max_overflow=1,
             pool_pre_ping=True,
             pool_recycle=300
         )
@@ -185,8 +451,60 @@ async def startup_event():
             expire_on_commit=False
         )
         
+        # asyncpg wants a plain postgresql:// DSN without the SQLAlchemy driver suffix
+        pg_pool = await asyncpg.create_pool(
+            make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False),
+            min_size=5,
+            max_size=20,
+            statement_cache_size=1024,
+            server_settings={"jit": "off"}
+        )
+        
+        # Every transaction on this engine is read-only, on top of the
+        # SELECT-only privileges of its role. Without a dedicated role /ask
+        # stays disabled
+        readonly_database_url = get_readonly_database_url()
+        if readonly_database_url is None:
+            logger.warning(
+                "READONLY_DATABASE_URL is unset or uses the DATABASE_URL role; /ask is disabled"
+            )
+        else:
+            readonly_engine = create_async_engine(
+                readonly_database_url,
+                echo=False,
+                pool_size=5,
+                max_overflow=5,
+                pool_pre_ping=True,
+                pool_recycle=300,
+                connect_args={"server_settings": {"default_transaction_read_only": "on"}}
+            )
+            
+            readonly_session_factory = async_sessionmaker(
+                readonly_engine,
+                class_=AsyncSession,
+                expire_on_commit=False
+            )
+        
         logger.info("Database connection established successfully")
         
+        await load_procedure_index()
+        
+        if geo.ZIP_COORDINATES_CSV:
+            count = geo.load_zip_coordinates(geo.ZIP_COORDINATES_CSV)
+            logger.info(f"Loaded {count} ZIP code coordinates from {geo.ZIP_COORDINATES_CSV}")
+        
+        if REDIS_URL:
+            response_cache = RedisCache.from_url(REDIS_URL)
+            logger.info("Redis response cache enabled")
+        
+        # HTTP/2 multiplexes concurrent completions over a few kept-alive connections
+        http_client = httpx.AsyncClient(
+            http2=True,
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+        )
+        client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=http_client)
+        
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}")
         raise
@@ -195,9 +513,17 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     """Close database connection"""
+    if http_client:
+        await http_client.aclose()
+    if pg_pool:
+        await pg_pool.close()
+    if readonly_engine:
+        await readonly_engine.dispose()
     if engine:
         await engine.dispose()
         logger.info("Database connection closed")
+    if response_cache:
+        await response_cache.close()
 
 # API Endpoints
 @app.get("/")
@@ -208,16 +534,31 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "GET /providers": "Search providers by DRG, ZIP, and radius",
-            "POST /ask": "AI assistant for natural language queries"
+            "POST /ask": "AI assistant for natural language queries",
+            "POST /admin/cache/invalidate": "Drop cached responses and reload procedures after a data refresh"
         }
     }
 
+def providers_response(providers: List[Dict]) -> Response:
+    """Serialize provider rows with PROVIDERS_ADAPTER, bypassing FastAPI's per-item response validation"""
+    content = PROVIDERS_ADAPTER.dump_json(PROVIDERS_ADAPTER.validate_python(providers))
+    return Response(content=content, media_type="application/json")
+
 @app.get("/providers", response_model=List[ProviderResponse])
+@cached(
+    "providers",
+    ttl=PROVIDERS_CACHE_TTL,
+    # Serialized as a JSON array so separators inside user input can't make two requests collide
+    key_builder=lambda drg, zip, radius_km, limit, offset, **_: hash_key(
+        orjson.dumps([drg, zip, radius_km, limit, offset]).decode()
+    )
+)
 async def search_providers(
     drg: Optional[str] = Query(None, description="MS-DRG code or description"),
     zip: Optional[str] = Query(None, description="ZIP code for location search"),
     radius_km: Optional[float] = Query(10.0, description="Search radius in kilometers"),
-    db: AsyncSession = Depends(get_db)
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of results"),
+    offset: int = Query(0, ge=0, description="Number of results to skip")
 ):
     """
     Search for healthcare providers offering specific DRG procedures within a radius of a ZIP code.
@@ -225,90 +566,67 @@ async def search_providers(
     - **drg**: MS-DRG code (e.g., "001") or description (e.g., "heart surgery")
     - **zip**: ZIP code for location-based search
     - **radius_km**: Search radius in kilometers (default: 10.0)
+    - **limit** / **offset**: Pagination (default: first 100 results, at most 1000 per page)
+    
+    At least one of `drg` or `zip` is required.
     """
+    if not drg and not zip:
+        raise HTTPException(status_code=400, detail="Provide at least one of 'drg' or 'zip'")
+    
     try:
-        # Build base query
-        query = select(
-            Provider.provider_id,
-            Provider.provider_name,
-            Provider.provider_city,
-            Provider.provider_state,
-            Provider.provider_zip_code,
-            Procedure.ms_drg_code,
-            Procedure.ms_drg_description,
-            ProviderProcedure.total_discharges,
-            ProviderProcedure.average_covered_charges,
-            ProviderProcedure.average_total_payments,
-            ProviderProcedure.average_medicare_payments,
-            Rating.rating
-        ).join(
-            ProviderProcedure, Provider.provider_id == ProviderProcedure.provider_id
-        ).join(
-            Procedure, ProviderProcedure.procedure_id == Procedure.id
-        ).outerjoin(
-            Rating, Provider.provider_id == Rating.provider_id
-        )
-        
-        # Add DRG filter if provided
+        # Known DRG codes and descriptions resolve to procedure ids in memory,
+        # so the procedures join can be skipped and the code/description
+        # filled in afterwards. Anything the index misses (e.g. procedures
+        # loaded after this worker started) is matched in SQL instead
+        procedure_ids = None
         if drg:
-            # Try to match by code first, then by description
             if drg.isdigit():
-                query = query.where(Procedure.ms_drg_code == drg)
+                if drg in procedure_ids_by_code:
+                    procedure_ids = [procedure_ids_by_code[drg]]
             else:
-                query = query.where(Procedure.ms_drg_description.ilike(f"%{drg}%"))
+                procedure_ids = match_procedure_descriptions(drg) or None
         
-        # Execute query
-        result = await db.execute(query)
-        rows = result.fetchall()
-        
-        # Convert to list of dictionaries
-        providers = []
-        for row in rows:
-            provider_data = {
-                "provider_id": row.provider_id,
-                "provider_name": row.provider_name,
-                "provider_city": row.provider_city,
-                "provider_state": row.provider_state,
-                "provider_zip_code": row.provider_zip_code,
-                "ms_drg_code": row.ms_drg_code,
-                "ms_drg_description": row.ms_drg_description,
-                "total_discharges": row.total_discharges,
-                "average_covered_charges": row.average_covered_charges,
-                "average_total_payments": row.average_total_payments,
-                "average_medicare_payments": row.average_medicare_payments,
-                "rating": row.rating
-            }
-            providers.append(provider_data)
-        
-        # Filter by location if ZIP code provided
+        target_coords = None
         if zip and radius_km:
-            target_coords = await get_zip_coordinates(zip)
-            if target_coords:
-                filtered_providers = []
-                for provider in providers:
-                    provider_coords = await get_zip_coordinates(provider["provider_zip_code"])
-                    if provider_coords:
-                        distance = calculate_distance(
-                            target_coords[0], target_coords[1],
-                            provider_coords[0], provider_coords[1]
-                        )
-                        if distance <= radius_km:
-                            provider["distance_km"] = round(distance, 2)
-                            filtered_providers.append(provider)
-                providers = filtered_providers
-            else:
+            target_coords = get_zip_coordinates(zip)
+            if not target_coords:
                 logger.warning(f"Could not find coordinates for ZIP code: {zip}")
         
-        return providers
+        sql, params = build_providers_query(drg, procedure_ids, target_coords, radius_km, limit, offset)
+        rows = await pg_pool.fetch(sql, *params)
+        providers = [dict(row) for row in rows]
+        if procedure_ids is not None:
+            for provider in providers:
+                ms_drg_code, ms_drg_description = procedures_by_id[provider.pop("procedure_id")]
+                provider["ms_drg_code"] = ms_drg_code
+                provider["ms_drg_description"] = ms_drg_description
+        
+        return providers_response(providers)
         
     except Exception as e:
         logger.error(f"Error searching providers: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@app.post("/admin/cache/invalidate", dependencies=[Depends(require_admin_token)])
+async def invalidate_cache():
+    """
+    Drop cached /providers and /ask responses and reload the procedure
+    lookup. Call this after the ETL refreshes the underlying tables.
+    """
+    await load_procedure_index()
+    
+    if response_cache is None:
+        return {"message": "Response cache is not enabled", "deleted": 0}
+    
+    deleted = 0
+    for pattern in ("providers:*", "ask:*"):
+        deleted += await response_cache.delete_pattern(pattern)
+    return {"message": "Response cache invalidated", "deleted": deleted}
+
 @app.post("/ask", response_model=AskResponse)
 async def ask_question(
     request: AskRequest,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_readonly_db)
 ):
     """
     AI assistant endpoint that converts natural language questions to SQL queries
@@ -319,40 +637,63 @@ async def ask_question(
     - Quality ratings (highest rated hospitals)
     - Provider information and statistics
     - Procedure details and pricing
+    
+    Queries without a trailing LIMIT of at most 1000 rows are streamed from a
+    server-side cursor; the response body has the same shape either way.
     """
     try:
         # Generate SQL query from natural language question
         sql_query = await generate_sql_from_question(request.question)
         
-        # Validate that the query is safe (basic validation)
-        dangerous_keywords = ["DROP", "DELETE", "INSERT", "UPDATE", "ALTER", "CREATE"]
-        if any(keyword in sql_query.upper() for keyword in dangerous_keywords):
-            return AskResponse(
-                question=request.question,
-                sql_query="",
-                results=[],
-                message="Sorry, I can only answer read-only questions about healthcare data."
-            )
+        # Identical SQL yields identical results, so reuse a cached response
+        cache_key = f"ask:{hash_key(sql_query)}"
+        if response_cache:
+            cached = await response_cache.get(cache_key)
+            if cached is not None:
+                return AskResponse(question=request.question, **cached)
         
-        # Execute the SQL query
+        # Execute the SQL query on the read-only connection; Postgres itself
+        # rejects anything that tries to write
         try:
-            result = await db.execute(sql_query)
-            rows = result.fetchall()
+            if not is_bounded_query(sql_query):
+                # The dependency session closes before a streamed body is sent,
+                # so the stream gets a session of its own
+                stream_session = readonly_session_factory()
+                try:
+                    result = await stream_session.stream(raw_sql(sql_query))
+                except BaseException:
+                    await stream_session.close()
+                    raise
+                return StreamingResponse(
+                    stream_ask_response(stream_session, result, request.question, sql_query),
+                    media_type="application/json"
+                )
             
-            # Convert results to list of dictionaries
-            results = []
-            for row in rows:
-                row_dict = {}
-                for i, column in enumerate(result.keys()):
-                    value = row[i]
-                    # Convert non-serializable types
-                    if hasattr(value, 'isoformat'):  # datetime
-                        value = value.isoformat()
-                    row_dict[column] = value
-                results.append(row_dict)
+            connection = await db.connection()
+            result = await connection.exec_driver_sql(sql_query)
+            
+            # Convert results to list of dictionaries; datetimes, UUIDs etc. are
+            # left to the response serializer
+            results = [dict(row) for row in result.mappings()]
             
             message = f"Found {len(results)} results for your query."
             
+        except DBAPIError as sql_error:
+            if getattr(sql_error.orig, "sqlstate", None) in READ_ONLY_VIOLATIONS:
+                logger.warning(f"Rejected write attempt from generated SQL: {sql_query}")
+                return AskResponse(
+                    question=request.question,
+                    sql_query="",
+                    results=[],
+                    message="Sorry, I can only answer read-only questions about healthcare data."
+                )
+            logger.error(f"SQL execution error: {sql_error}")
+            return AskResponse(
+                question=request.question,
+                sql_query=sql_query,
+                results=[],
+                message="Sorry, I couldn't execute that query. Please try rephrasing your question."
+            )
         except Exception as sql_error:
             logger.error(f"SQL execution error: {sql_error}")
             return AskResponse(
@@ -362,12 +703,19 @@ async def ask_question(
                 message="Sorry, I couldn't execute that query. Please try rephrasing your question."
             )
         
-        return AskResponse(
+        response = AskResponse(
             question=request.question,
             sql_query=sql_query,
             results=results,
             message=message
         )
+        if response_cache:
+            await response_cache.set(
+                cache_key,
+                response.model_dump(mode="json", exclude={"question"}),
+                ttl=ASK_CACHE_TTL
+            )
+        return response
         
     except Exception as e:
         logger.error(f"Error processing question: {e}")
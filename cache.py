@@ -0,0 +1,110 @@
+"""
+Caching helpers for the Healthcare Pricing API
+
+- LRUCache: small in-process exact-match cache (e.g. question -> generated SQL)
+- RedisCache: optional shared cache backed by a redis.asyncio connection
+  pool, enabled by setting REDIS_URL (e.g. redis://localhost:6379/0)
+
+Cache failures are never fatal: Redis errors are logged and treated as misses.
+"""
+
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from typing import Any, Optional
+
+import orjson
+import redis.asyncio as redis
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL")
+
+
+def normalize_question(question: str) -> str:
+    """Normalize question text so trivially different phrasings share a cache key"""
+    return " ".join(question.strip().lower().split())
+
+
+def hash_key(value: str) -> str:
+    """Stable short digest used to build cache keys from long strings"""
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """Bounded in-process LRU cache"""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        if key not in self._data:
+            return None
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def set(self, key: str, value: Any) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+class RedisCache:
+    """JSON cache stored in Redis with a per-entry TTL"""
+
+    def __init__(self, client: redis.Redis):
+        self.client = client
+
+    @classmethod
+    def from_url(cls, url: str, max_connections: int = 20) -> "RedisCache":
+        pool = redis.ConnectionPool.from_url(url, max_connections=max_connections)
+        return cls(redis.Redis(connection_pool=pool))
+
+    async def get_raw(self, key: str) -> Optional[bytes]:
+        """Get the serialized payload stored under key"""
+        try:
+            return await self.client.get(key)
+        except redis.RedisError as e:
+            logger.warning(f"Redis get failed for {key}: {e}")
+            return None
+
+    async def set_raw(self, key: str, payload: bytes, ttl: int = 3600) -> None:
+        """Store an already-serialized payload under key"""
+        try:
+            await self.client.set(key, payload, ex=ttl)
+        except redis.RedisError as e:
+            logger.warning(f"Redis set failed for {key}: {e}")
+
+    async def get(self, key: str) -> Optional[Any]:
+        payload = await self.get_raw(key)
+        if payload is None:
+            return None
+        return orjson.loads(payload)
+
+    async def set(self, key: str, value: Any, ttl: int = 3600) -> None:
+        await self.set_raw(key, orjson.dumps(value), ttl)
+
+    async def delete_pattern(self, pattern: str) -> int:
+        """Delete every key matching a glob pattern, returning how many were removed"""
+        deleted = 0
+        try:
+            batch = []
+            async for key in self.client.scan_iter(match=pattern, count=500):
+                batch.append(key)
+                if len(batch) >= 500:
+                    deleted += await self.client.unlink(*batch)
+                    batch = []
+            if batch:
+                deleted += await self.client.unlink(*batch)
+        except redis.RedisError as e:
+            logger.warning(f"Redis delete failed for {pattern}: {e}")
+        return deleted
+
+    async def close(self) -> None:
+        await self.client.aclose()
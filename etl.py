@@ -18,19 +18,21 @@ Features:
 
 import asyncio
 import csv
+import hashlib
 import logging
 import os
-import random
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 
-import pandas as pd
-from sqlalchemy import select, text
+import numpy as np
+import polars as pl
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
-from models import Base, Provider, Procedure, ProviderProcedure, Rating
 from database_config import get_database_url
+import geo
 
 # Configure logging
 logging.basicConfig(
@@ -43,6 +45,84 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# CMS columns the ETL reads; everything else is never parsed
+CSV_COLUMNS = [
+    'Rndrng_Prvdr_CCN',
+    'Rndrng_Prvdr_Org_Name',
+    'Rndrng_Prvdr_City',
+    'Rndrng_Prvdr_State_Abrvtn',
+    'Rndrng_Prvdr_Zip5',
+    'DRG_Cd',
+    'DRG_Desc',
+    'Tot_Dschrgs',
+    'Avg_Submtd_Cvrd_Chrg',
+    'Avg_Tot_Pymt_Amt',
+    'Avg_Mdcr_Pymt_Amt'
+]
+
+# Numeric columns are parsed natively by the CSV reader; everything else is a string
+CSV_SCHEMA_OVERRIDES = {
+    'Tot_Dschrgs': pl.Int64,
+    'Avg_Submtd_Cvrd_Chrg': pl.Float64,
+    'Avg_Tot_Pymt_Amt': pl.Float64,
+    'Avg_Mdcr_Pymt_Amt': pl.Float64
+}
+
+# Cleaned record fields, grouped by the table they are written to
+PROVIDER_FIELDS = ('provider_id', 'provider_name', 'provider_city', 'provider_state',
+                   'provider_zip_code', 'latitude', 'longitude')
+PROCEDURE_FIELDS = ('ms_drg_code', 'ms_drg_description')
+FINANCIAL_FIELDS = ('total_discharges', 'average_covered_charges',
+                    'average_total_payments', 'average_medicare_payments')
+def clean_text(column: str, max_length: int = None) -> pl.Expr:
+    """
+    Clean a text column: drop non-printable characters (and the U+FFFD left
+    behind by utf8-lossy decoding), collapse whitespace and optionally
+    truncate. Missing values become empty strings.
+    """
+    expr = (
+        pl.col(column)
+        .fill_null('')
+        .str.replace_all(r'[\p{C}&&\S]|\x{FFFD}', '')
+        .str.replace_all(r'\s+', ' ')
+        .str.strip_chars()
+    )
+    if max_length:
+        expr = expr.str.slice(0, max_length)
+    return expr
+
+
+def column_lists(frame: pl.DataFrame, fields: Tuple[str, ...]) -> Dict[str, list]:
+    """
+    A frame's columns as Python lists keyed by field, for INSERT ... SELECT
+    FROM unnest(...) statements that take whole columns as array parameters
+    """
+    return {field: frame.get_column(field).to_list() for field in fields}
+
+
+def dedupe_records(records: pl.DataFrame) -> Tuple[pl.DataFrame, pl.DataFrame, pl.DataFrame]:
+    """
+    Split cleaned records into provider, procedure and provider_procedure rows
+    
+    A statement can only upsert a given row once, so each table keeps the
+    last occurrence of its key.
+    """
+    return (
+        records.unique('provider_id', keep='last', maintain_order=True),
+        records.unique('ms_drg_code', keep='last', maintain_order=True),
+        records.unique(['provider_id', 'ms_drg_code'], keep='last', maintain_order=True)
+    )
+
+
+def column_rows(frame: pl.DataFrame, fields: Tuple[str, ...]):
+    """
+    Iterate a frame's rows as tuples of the given fields
+    
+    Each column is converted to a Python list in one pass and the lists are
+    zipped, which is cheaper than polars' row-by-row iter_rows().
+    """
+    return zip(*(frame.get_column(field).to_list() for field in fields))
+
 
 class HealthcareDataETL:
     """ETL processor for healthcare pricing data"""
@@ -59,16 +139,28 @@ class HealthcareDataETL:
         self.batch_size = batch_size
         self.engine = None
         self.session_factory = None
+        self._drg_id_cache: Dict[str, int] = {}  # ms_drg_code -> procedures.id
+        self._drg_description_cache: Dict[str, str] = {}  # ms_drg_code -> last upserted description
         
     async def initialize_database(self):
         """Initialize database connection and session factory"""
         try:
-            database_url = get_database_url(async_driver=True)
+            # The bulk paths need asyncpg (COPY, prepared statement cache), even
+            # when DATABASE_URL is a plain postgresql:// URL
+            database_url = make_url(get_database_url(async_driver=True))
+            if database_url.drivername == 'postgresql':
+                database_url = database_url.set(drivername='postgresql+asyncpg')
+            
+            # The run holds one connection throughout, so no pre-ping or
+            # recycling. process_batch's statements have a fixed text
+            # whatever the batch size, so each is prepared once
             self.engine = create_async_engine(
                 database_url,
                 echo=False,
-                pool_pre_ping=True,
-                pool_recycle=300
+                connect_args={
+                    "statement_cache_size": 1024,
+                    "prepared_statement_cache_size": 1024
+                }
             )
             
             # Test connection
@@ -87,41 +179,12 @@ class HealthcareDataETL:
             logger.error(f"Failed to initialize database: {e}")
             raise
     
-    def clean_text_field(self, text: str, max_length: int = None) -> str:
-        """
-        Clean text field by removing problematic characters and handling encoding issues
-        
-        Args:
-            text: Raw text to clean
-            max_length: Maximum length to truncate to
-            
-        Returns:
-            Cleaned text
-        """
-        if not text:
-            return ""
-        
-        # Convert to string and strip whitespace
-        text = str(text).strip()
-        
-        # Remove any non-printable characters that might cause encoding issues
-        text = ''.join(char for char in text if char.isprintable() or char.isspace())
-        
-        # Clean up extra whitespace
-        text = ' '.join(text.split())
-        
-        # Truncate if max_length specified
-        if max_length and len(text) > max_length:
-            text = text[:max_length]
-        
-        return text
-    
     def log_problematic_row_details(self, chunk, batch_count: int, error: Exception):
         """
         Log detailed information about a problematic row
         
         Args:
-            chunk: The pandas DataFrame chunk
+            chunk: The polars DataFrame slice
             batch_count: Current batch number
             error: The exception that occurred
         """
@@ -135,7 +198,7 @@ class HealthcareDataETL:
                 logger.error(f"Error position: {error.start}-{error.end}")
             
             # Try to get row information
-            if chunk is not None and hasattr(chunk, 'iloc'):
+            if chunk is not None and hasattr(chunk, 'head'):
                 logger.error(f"Chunk size: {len(chunk)}")
                 logger.error(f"Chunk columns: {list(chunk.columns)}")
                 
@@ -143,8 +206,7 @@ class HealthcareDataETL:
                 try:
                     # Show first few rows for context
                     logger.error("First 3 rows of chunk:")
-                    for i in range(min(3, len(chunk))):
-                        row_data = chunk.iloc[i].to_dict()
+                    for i, row_data in enumerate(chunk.head(3).to_dicts()):
                         # Clean the row data for logging
                         clean_row = {}
                         for key, value in row_data.items():
@@ -163,351 +225,328 @@ class HealthcareDataETL:
         except Exception as log_error:
             logger.error(f"Error in logging problematic row details: {log_error}")
     
-    def clean_provider_data(self, row: Dict) -> Optional[Dict]:
+    def clean_records(self, frame: pl.LazyFrame) -> pl.LazyFrame:
         """
-        Clean and validate provider data from CSV row with new column names
+        Clean and validate raw CSV rows with polars expressions
         
         Args:
-            row: Raw CSV row data
+            frame: Raw CSV rows (CSV_COLUMNS, typed per CSV_SCHEMA_OVERRIDES)
             
         Returns:
-            Cleaned provider data or None if invalid
+            Frame with the PROVIDER_FIELDS, PROCEDURE_FIELDS and FINANCIAL_FIELDS
+            columns plus an is_valid flag for rows missing required data
         """
-        try:
-            # Extract and clean provider fields using new CSV column names
-            provider_id = self.clean_text_field(row.get('Rndrng_Prvdr_CCN', ''))
-            provider_name = self.clean_text_field(row.get('Rndrng_Prvdr_Org_Name', ''), 255)
-            provider_city = self.clean_text_field(row.get('Rndrng_Prvdr_City', ''), 100)
-            provider_state = self.clean_text_field(row.get('Rndrng_Prvdr_State_Abrvtn', ''))
-            provider_zip_code = self.clean_text_field(row.get('Rndrng_Prvdr_Zip5', ''))
-            
-            # Validate required fields
-            if not all([provider_id, provider_name, provider_city, provider_state, provider_zip_code]):
-                logger.warning(f"Skipping row with missing provider data: {provider_id}")
-                return None
-            
-            # Clean zip code (remove non-numeric characters, ensure 5 digits)
-            provider_zip_code = ''.join(filter(str.isdigit, provider_zip_code))
-            if len(provider_zip_code) < 5:
-                provider_zip_code = provider_zip_code.zfill(5)
-            elif len(provider_zip_code) > 5:
-                provider_zip_code = provider_zip_code[:5]
-            
-            # Clean state (ensure 2-letter format)
-            provider_state = provider_state.upper()[:2]
-            
-            return {
-                'provider_id': provider_id,
-                'provider_name': provider_name,
-                'provider_city': provider_city.title(),
-                'provider_state': provider_state,
-                'provider_zip_code': provider_zip_code
-            }
-            
-        except Exception as e:
-            logger.error(f"Error cleaning provider data: {e}")
-            return None
-    
-    def clean_procedure_data(self, row: Dict) -> Optional[Dict]:
-        """
-        Clean and validate procedure data from CSV row with new column names
+        # Geocode from the ZIP code (left NULL when the ZIP is unknown)
+        zip_latitudes = dict(zip(geo.zip_codes, geo.zip_lat.tolist()))
+        zip_longitudes = dict(zip(geo.zip_codes, geo.zip_lon.tolist()))
         
-        Args:
-            row: Raw CSV row data
-            
-        Returns:
-            Cleaned procedure data or None if invalid
-        """
-        try:
-            # Extract DRG code and description using new CSV column names
-            ms_drg_code = self.clean_text_field(row.get('DRG_Cd', ''))
-            ms_drg_description = self.clean_text_field(row.get('DRG_Desc', ''), 500)
-            
-            if not ms_drg_code or not ms_drg_description:
-                logger.warning(f"Skipping row with missing procedure data: {ms_drg_code}")
-                return None
-            
-            # Clean DRG code (remove any non-alphanumeric characters)
-            ms_drg_code = ''.join(c for c in ms_drg_code if c.isalnum())
-            
-            return {
-                'ms_drg_code': ms_drg_code,
-                'ms_drg_description': ms_drg_description
-            }
-            
-        except Exception as e:
-            logger.error(f"Error cleaning procedure data: {e}")
-            return None
+        return (
+            frame
+            .select(
+                clean_text('Rndrng_Prvdr_CCN').alias('provider_id'),
+                clean_text('Rndrng_Prvdr_Org_Name', 255).alias('provider_name'),
+                clean_text('Rndrng_Prvdr_City', 100).alias('provider_city'),
+                clean_text('Rndrng_Prvdr_State_Abrvtn').alias('provider_state'),
+                clean_text('Rndrng_Prvdr_Zip5').alias('provider_zip_code'),
+                clean_text('DRG_Cd').alias('ms_drg_code'),
+                clean_text('DRG_Desc', 500).alias('ms_drg_description'),
+                pl.col('Tot_Dschrgs').alias('total_discharges'),
+                pl.col('Avg_Submtd_Cvrd_Chrg').alias('average_covered_charges'),
+                pl.col('Avg_Tot_Pymt_Amt').alias('average_total_payments'),
+                pl.col('Avg_Mdcr_Pymt_Amt').alias('average_medicare_payments')
+            )
+            .with_columns(
+                # Required text fields, and at least some financial data
+                (
+                    pl.all_horizontal(pl.col(field) != '' for field in PROVIDER_FIELDS[:5] + PROCEDURE_FIELDS)
+                    & ~pl.all_horizontal(pl.col(field).is_null() for field in FINANCIAL_FIELDS)
+                ).alias('is_valid'),
+                # ZIP code: digits only, exactly 5 characters
+                pl.col('provider_zip_code').str.replace_all(r'\D', '').str.zfill(5).str.slice(0, 5),
+                pl.col('provider_city').str.to_titlecase(),
+                # State: 2-letter format
+                pl.col('provider_state').str.to_uppercase().str.slice(0, 2),
+                # DRG code: alphanumeric characters only
+                pl.col('ms_drg_code').str.replace_all(r'[^\p{L}\p{N}]', '')
+            )
+            .with_columns(
+                pl.col('provider_zip_code').replace_strict(zip_latitudes, default=None, return_dtype=pl.Float64).alias('latitude'),
+                pl.col('provider_zip_code').replace_strict(zip_longitudes, default=None, return_dtype=pl.Float64).alias('longitude')
+            )
+        )
     
-    def clean_financial_data(self, row: Dict) -> Optional[Dict]:
+    def generate_mock_ratings(self, provider_ids: List[str]) -> List[int]:
         """
-        Clean and validate financial data from CSV row with new column names
+        Generate mock star ratings (1-10) for a list of providers
         
-        Args:
-            row: Raw CSV row data
-            
-        Returns:
-            Cleaned financial data or None if invalid
-        """
-        try:
-            # Extract numeric fields using new CSV column names
-            total_discharges = row.get('Tot_Dschrgs')
-            average_covered_charges = row.get('Avg_Submtd_Cvrd_Chrg')
-            average_total_payments = row.get('Avg_Tot_Pymt_Amt')
-            average_medicare_payments = row.get('Avg_Mdcr_Pymt_Amt')
-            
-            # Convert to numeric values, handling various formats
-            def clean_numeric(value):
-                if pd.isna(value) or value == '':
-                    return None
-                try:
-                    # Remove currency symbols and commas
-                    if isinstance(value, str):
-                        value = value.replace('$', '').replace(',', '').strip()
-                    return float(value) if value else None
-                except (ValueError, TypeError):
-                    return None
-            
-            total_discharges = clean_numeric(total_discharges)
-            average_covered_charges = clean_numeric(average_covered_charges)
-            average_total_payments = clean_numeric(average_total_payments)
-            average_medicare_payments = clean_numeric(average_medicare_payments)
-            
-            # Validate that we have at least some financial data
-            if all(v is None for v in [total_discharges, average_covered_charges, 
-                                      average_total_payments, average_medicare_payments]):
-                logger.warning("Skipping row with no valid financial data")
-                return None
-            
-            return {
-                'total_discharges': total_discharges,
-                'average_covered_charges': average_covered_charges,
-                'average_total_payments': average_total_payments,
-                'average_medicare_payments': average_medicare_payments
-            }
-            
-        except Exception as e:
-            logger.error(f"Error cleaning financial data: {e}")
-            return None
-    
-    def filter_ny_providers(self, batch_data: List[Dict]) -> List[Dict]:
-        """
-        Filter batch data to include only NY providers
+        Ratings come from a BLAKE2b digest of each provider_id, so they are the
+        same on every run without seeding the global random generator.
         
         Args:
-            batch_data: List of CSV row dictionaries
+            provider_ids: Provider identifiers for consistent rating generation
             
         Returns:
-            Filtered list containing only NY providers
+            Mock ratings between 1 and 10, in the same order
         """
-        try:
-            ny_providers = []
-            for row in batch_data:
-                state = str(row.get('Rndrng_Prvdr_State_Abrvtn', '')).strip().upper()
-                if state == 'NY':
-                    ny_providers.append(row)
-            
-            return ny_providers
-            
-        except Exception as e:
-            logger.error(f"Error filtering NY providers: {e}")
-            return []
+        digests = b''.join(
+            hashlib.blake2b(provider_id.encode(), digest_size=8).digest()
+            for provider_id in provider_ids
+        )
+        ratings = np.frombuffer(digests, dtype='<u8') % 10 + 1
+        return ratings.tolist()
     
-    def generate_mock_rating(self, provider_id: str) -> int:
+    async def process_batch(self, session: AsyncSession, batch: pl.DataFrame) -> Tuple[int, int]:
         """
-        Generate a mock star rating (1-10) for a provider
+        Upsert a batch of cleaned records with one INSERT ... ON CONFLICT per table
         
-        Args:
-            provider_id: Provider identifier for consistent rating generation
-            
-        Returns:
-            Mock rating between 1 and 10
-        """
-        # Use provider_id hash for consistent rating generation
-        random.seed(hash(provider_id) % 2**32)
-        rating = random.randint(1, 10)
-        random.seed()  # Reset seed
-        return rating
-    
-    async def get_or_create_provider(self, session: AsyncSession, provider_data: Dict) -> Provider:
-        """
-        Get existing provider or create new one
+        The batch is committed as its own transaction, so a failure only
+        discards this batch and earlier batches stay committed.
         
         Args:
             session: Database session
-            provider_data: Cleaned provider data
+            batch: Cleaned records
             
         Returns:
-            Provider instance
+            Tuple of (processed_count, error_count)
         """
-        # Check if provider exists
-        stmt = select(Provider).where(Provider.provider_id == provider_data['provider_id'])
-        result = await session.execute(stmt)
-        existing_provider = result.scalar_one_or_none()
+        providers, procedures, provider_procedures = dedupe_records(batch)
         
-        if existing_provider:
-            # Update existing provider data
-            for key, value in provider_data.items():
-                setattr(existing_provider, key, value)
-            logger.debug(f"Updated existing provider: {provider_data['provider_id']}")
-            return existing_provider
-        else:
-            # Create new provider
-            new_provider = Provider(**provider_data)
-            session.add(new_provider)
-            logger.debug(f"Created new provider: {provider_data['provider_id']}")
-            return new_provider
-    
-    async def get_or_create_procedure(self, session: AsyncSession, procedure_data: Dict) -> Procedure:
-        """
-        Get existing procedure or create new one
+        # The same DRGs recur in every batch; only send ones not yet upserted
+        # with this description during the run
+        cached_description = pl.col('ms_drg_code').replace_strict(
+            self._drg_description_cache, default=None, return_dtype=pl.String
+        )
+        procedures = procedures.filter(cached_description.ne_missing(pl.col('ms_drg_description')))
         
-        Args:
-            session: Database session
-            procedure_data: Cleaned procedure data
+        # Every statement takes whole columns as array parameters, so its
+        # text is the same whatever the batch size and asyncpg prepares it
+        # once per run
+        async with session.begin():
+            await session.execute(
+                text("""
+                    INSERT INTO providers (provider_id, provider_name, provider_city, provider_state,
+                                           provider_zip_code, latitude, longitude)
+                    SELECT * FROM unnest(
+                        CAST(:provider_id AS VARCHAR[]), CAST(:provider_name AS VARCHAR[]),
+                        CAST(:provider_city AS VARCHAR[]), CAST(:provider_state AS VARCHAR[]),
+                        CAST(:provider_zip_code AS VARCHAR[]), CAST(:latitude AS FLOAT8[]),
+                        CAST(:longitude AS FLOAT8[])
+                    )
+                    ON CONFLICT (provider_id) DO UPDATE SET
+                        provider_name = EXCLUDED.provider_name,
+                        provider_city = EXCLUDED.provider_city,
+                        provider_state = EXCLUDED.provider_state,
+                        provider_zip_code = EXCLUDED.provider_zip_code,
+                        latitude = EXCLUDED.latitude,
+                        longitude = EXCLUDED.longitude
+                """),
+                column_lists(providers, PROVIDER_FIELDS)
+            )
             
-        Returns:
-            Procedure instance
-        """
-        # Check if procedure exists
-        stmt = select(Procedure).where(Procedure.ms_drg_code == procedure_data['ms_drg_code'])
-        result = await session.execute(stmt)
-        existing_procedure = result.scalar_one_or_none()
+            procedure_ids = dict(self._drg_id_cache)
+            if len(procedures):
+                # RETURNING hands back ids for inserted and updated rows alike
+                result = await session.execute(
+                    text("""
+                        INSERT INTO procedures (ms_drg_code, ms_drg_description)
+                        SELECT * FROM unnest(CAST(:ms_drg_code AS VARCHAR[]), CAST(:ms_drg_description AS TEXT[]))
+                        ON CONFLICT (ms_drg_code) DO UPDATE SET
+                            ms_drg_description = EXCLUDED.ms_drg_description
+                        RETURNING ms_drg_code, id
+                    """),
+                    column_lists(procedures, PROCEDURE_FIELDS)
+                )
+                procedure_ids.update(result.all())
+            
+            # Only overwrite financial fields the new row actually has
+            await session.execute(
+                text("""
+                    INSERT INTO provider_procedures (provider_id, procedure_id, total_discharges,
+                                                     average_covered_charges, average_total_payments,
+                                                     average_medicare_payments)
+                    SELECT * FROM unnest(
+                        CAST(:provider_id AS VARCHAR[]), CAST(:procedure_id AS INTEGER[]),
+                        CAST(:total_discharges AS SMALLINT[]), CAST(:average_covered_charges AS FLOAT8[]),
+                        CAST(:average_total_payments AS FLOAT8[]), CAST(:average_medicare_payments AS FLOAT8[])
+                    )
+                    ON CONFLICT ON CONSTRAINT uq_provider_procedure DO UPDATE SET
+                        total_discharges = COALESCE(EXCLUDED.total_discharges, provider_procedures.total_discharges),
+                        average_covered_charges = COALESCE(EXCLUDED.average_covered_charges, provider_procedures.average_covered_charges),
+                        average_total_payments = COALESCE(EXCLUDED.average_total_payments, provider_procedures.average_total_payments),
+                        average_medicare_payments = COALESCE(EXCLUDED.average_medicare_payments, provider_procedures.average_medicare_payments)
+                """),
+                {
+                    'provider_id': provider_procedures['provider_id'].to_list(),
+                    'procedure_id': [procedure_ids[code] for code in provider_procedures['ms_drg_code'].to_list()],
+                    **column_lists(provider_procedures, FINANCIAL_FIELDS)
+                }
+            )
+            
+            # Ratings are derived from the provider_id, so a provider that
+            # already has one keeps it
+            provider_ids = providers['provider_id'].to_list()
+            await session.execute(
+                text("""
+                    INSERT INTO ratings (provider_id, rating)
+                    SELECT * FROM unnest(CAST(:provider_id AS VARCHAR[]), CAST(:rating AS INTEGER[]))
+                    ON CONFLICT ON CONSTRAINT uq_rating_provider DO NOTHING
+                """),
+                {'provider_id': provider_ids, 'rating': self.generate_mock_ratings(provider_ids)}
+            )
         
-        if existing_procedure:
-            # Update existing procedure description
-            existing_procedure.ms_drg_description = procedure_data['ms_drg_description']
-            logger.debug(f"Updated existing procedure: {procedure_data['ms_drg_code']}")
-            return existing_procedure
-        else:
-            # Create new procedure
-            new_procedure = Procedure(**procedure_data)
-            session.add(new_procedure)
-            logger.debug(f"Created new procedure: {procedure_data['ms_drg_code']}")
-            return new_procedure
+        # Only cache ids once the batch has been committed
+        self._drg_id_cache = procedure_ids
+        self._drg_description_cache.update(
+            zip(procedures['ms_drg_code'].to_list(), procedures['ms_drg_description'].to_list())
+        )
+        return len(batch), 0
+    
+    async def is_initial_load(self, session: AsyncSession) -> bool:
+        """Check whether the target tables are still empty (first ETL run)"""
+        result = await session.execute(text("SELECT NOT EXISTS (SELECT 1 FROM providers)"))
+        return result.scalar()
     
-    async def upsert_provider_procedure(self, session: AsyncSession, 
-                                      provider: Provider, procedure: Procedure, 
-                                      financial_data: Dict) -> ProviderProcedure:
+    async def bulk_load(self, session: AsyncSession, records: pl.DataFrame) -> int:
         """
-        Upsert provider-procedure relationship with financial data
+        Load cleaned records into empty tables with binary COPY
+        
+        Records are copied into temporary staging tables (unlogged, dropped at
+        commit) and moved into the real tables with one INSERT ... SELECT ...
+        ON CONFLICT per table, so the upsert rules match process_batch.
         
         Args:
             session: Database session
-            provider: Provider instance
-            procedure: Procedure instance
-            financial_data: Cleaned financial data
+            records: Cleaned records
             
         Returns:
-            ProviderProcedure instance
+            Number of records loaded
         """
-        # Check if relationship exists
-        stmt = select(ProviderProcedure).where(
-            ProviderProcedure.provider_id == provider.provider_id,
-            ProviderProcedure.procedure_id == procedure.id
-        )
-        result = await session.execute(stmt)
-        existing_pp = result.scalar_one_or_none()
+        providers, procedures, provider_procedures = dedupe_records(records)
+        provider_ids = providers['provider_id'].to_list()
+        ratings = list(zip(provider_ids, self.generate_mock_ratings(provider_ids)))
         
-        if existing_pp:
-            # Update existing relationship
-            for key, value in financial_data.items():
-                if value is not None:  # Only update non-None values
-                    setattr(existing_pp, key, value)
-            logger.debug(f"Updated existing provider-procedure relationship")
-            return existing_pp
-        else:
-            # Create new relationship
-            new_pp = ProviderProcedure(
-                provider_id=provider.provider_id,
-                procedure_id=procedure.id,
-                **financial_data
-            )
-            session.add(new_pp)
-            logger.debug(f"Created new provider-procedure relationship")
-            return new_pp
-    
-    async def upsert_rating(self, session: AsyncSession, provider: Provider, rating_value: int) -> Rating:
-        """
-        Upsert provider rating
+        # COPY needs the asyncpg connection underneath the session's transaction
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+        conn = raw_connection.driver_connection
         
-        Args:
-            session: Database session
-            provider: Provider instance
-            rating_value: Rating value (1-10)
-            
-        Returns:
-            Rating instance
-        """
-        # Check if rating exists
-        stmt = select(Rating).where(Rating.provider_id == provider.provider_id)
-        result = await session.execute(stmt)
-        existing_rating = result.scalar_one_or_none()
+        await conn.execute("""
+            CREATE TEMP TABLE staging_providers
+                (LIKE providers) ON COMMIT DROP;
+            CREATE TEMP TABLE staging_procedures
+                (ms_drg_code VARCHAR, ms_drg_description TEXT) ON COMMIT DROP;
+            CREATE TEMP TABLE staging_provider_procedures
+                (provider_id VARCHAR, ms_drg_code VARCHAR, total_discharges SMALLINT,
+                 average_covered_charges FLOAT, average_total_payments FLOAT,
+                 average_medicare_payments FLOAT) ON COMMIT DROP;
+            CREATE TEMP TABLE staging_ratings
+                (provider_id VARCHAR, rating INTEGER) ON COMMIT DROP;
+        """)
         
-        if existing_rating:
-            # Update existing rating
-            existing_rating.rating = rating_value
-            logger.debug(f"Updated existing rating for provider: {provider.provider_id}")
-            return existing_rating
-        else:
-            # Create new rating
-            new_rating = Rating(
-                provider_id=provider.provider_id,
-                rating=rating_value
-            )
-            session.add(new_rating)
-            logger.debug(f"Created new rating for provider: {provider.provider_id}")
-            return new_rating
+        await conn.copy_records_to_table(
+            'staging_providers',
+            records=column_rows(providers, PROVIDER_FIELDS),
+            columns=list(PROVIDER_FIELDS)
+        )
+        await conn.copy_records_to_table(
+            'staging_procedures',
+            records=column_rows(procedures, PROCEDURE_FIELDS),
+            columns=list(PROCEDURE_FIELDS)
+        )
+        await conn.copy_records_to_table(
+            'staging_provider_procedures',
+            records=column_rows(provider_procedures, ('provider_id', 'ms_drg_code') + FINANCIAL_FIELDS),
+            columns=['provider_id', 'ms_drg_code', *FINANCIAL_FIELDS]
+        )
+        await conn.copy_records_to_table(
+            'staging_ratings',
+            records=ratings,
+            columns=['provider_id', 'rating']
+        )
+        
+        await conn.execute("""
+            INSERT INTO providers (provider_id, provider_name, provider_city, provider_state,
+                                   provider_zip_code, latitude, longitude)
+            SELECT provider_id, provider_name, provider_city, provider_state,
+                   provider_zip_code, latitude, longitude
+            FROM staging_providers
+            ON CONFLICT (provider_id) DO UPDATE SET
+                provider_name = EXCLUDED.provider_name,
+                provider_city = EXCLUDED.provider_city,
+                provider_state = EXCLUDED.provider_state,
+                provider_zip_code = EXCLUDED.provider_zip_code,
+                latitude = EXCLUDED.latitude,
+                longitude = EXCLUDED.longitude;
+            
+            INSERT INTO procedures (ms_drg_code, ms_drg_description)
+            SELECT ms_drg_code, ms_drg_description
+            FROM staging_procedures
+            ON CONFLICT (ms_drg_code) DO UPDATE SET
+                ms_drg_description = EXCLUDED.ms_drg_description;
+            
+            INSERT INTO provider_procedures (provider_id, procedure_id, total_discharges,
+                                             average_covered_charges, average_total_payments,
+                                             average_medicare_payments)
+            SELECT s.provider_id, pr.id, s.total_discharges,
+                   s.average_covered_charges, s.average_total_payments,
+                   s.average_medicare_payments
+            FROM staging_provider_procedures s
+            JOIN procedures pr ON pr.ms_drg_code = s.ms_drg_code
+            ON CONFLICT ON CONSTRAINT uq_provider_procedure DO UPDATE SET
+                total_discharges = COALESCE(EXCLUDED.total_discharges, provider_procedures.total_discharges),
+                average_covered_charges = COALESCE(EXCLUDED.average_covered_charges, provider_procedures.average_covered_charges),
+                average_total_payments = COALESCE(EXCLUDED.average_total_payments, provider_procedures.average_total_payments),
+                average_medicare_payments = COALESCE(EXCLUDED.average_medicare_payments, provider_procedures.average_medicare_payments);
+            
+            INSERT INTO ratings (provider_id, rating)
+            SELECT provider_id, rating
+            FROM staging_ratings
+            ON CONFLICT ON CONSTRAINT uq_rating_provider DO NOTHING;
+        """)
+        
+        return len(records)
     
-    async def process_batch(self, session: AsyncSession, batch_data: List[Dict]) -> Tuple[int, int]:
+    async def backfill_coordinates(self, session: AsyncSession) -> int:
         """
-        Process a batch of CSV rows
+        Geocode providers that still have NULL coordinates
+        
+        Covers rows loaded before the coordinate columns existed, or while
+        their ZIP was missing from the ZIP table, that this run's CSV did not
+        upsert again. The API only searches providers with coordinates.
         
         Args:
             session: Database session
-            batch_data: List of CSV row dictionaries
             
         Returns:
-            Tuple of (processed_count, error_count)
+            Number of providers geocoded
         """
-        processed_count = 0
-        error_count = 0
+        result = await session.execute(text(
+            "SELECT provider_id, provider_zip_code FROM providers WHERE latitude IS NULL"
+        ))
+        located = [
+            (provider_id, geo.zip_to_idx[zip_code])
+            for provider_id, zip_code in result.all()
+            if zip_code in geo.zip_to_idx
+        ]
+        if not located:
+            return 0
         
-        for row in batch_data:
-            try:
-                # Clean data
-                provider_data = self.clean_provider_data(row)
-                procedure_data = self.clean_procedure_data(row)
-                financial_data = self.clean_financial_data(row)
-                
-                if not all([provider_data, procedure_data, financial_data]):
-                    error_count += 1
-                    continue
-                
-                # Get or create provider and procedure
-                provider = await self.get_or_create_provider(session, provider_data)
-                procedure = await self.get_or_create_procedure(session, procedure_data)
-                
-                # Upsert provider-procedure relationship
-                await self.upsert_provider_procedure(session, provider, procedure, financial_data)
-                
-                # Generate and upsert rating (only once per provider)
-                if not hasattr(self, '_rated_providers'):
-                    self._rated_providers = set()
-                
-                if provider.provider_id not in self._rated_providers:
-                    rating_value = self.generate_mock_rating(provider.provider_id)
-                    await self.upsert_rating(session, provider, rating_value)
-                    self._rated_providers.add(provider.provider_id)
-                
-                processed_count += 1
-                
-            except Exception as e:
-                logger.error(f"Error processing row: {e}")
-                error_count += 1
-                continue
-        
-        return processed_count, error_count
+        provider_ids, indices = zip(*located)
+        await session.execute(
+            text("""
+                UPDATE providers p
+                SET latitude = c.latitude, longitude = c.longitude
+                FROM unnest(CAST(:provider_ids AS VARCHAR[]), CAST(:latitudes AS FLOAT8[]),
+                            CAST(:longitudes AS FLOAT8[])) AS c (provider_id, latitude, longitude)
+                WHERE p.provider_id = c.provider_id
+            """),
+            {
+                'provider_ids': list(provider_ids),
+                'latitudes': geo.zip_lat[list(indices)].tolist(),
+                'longitudes': geo.zip_lon[list(indices)].tolist()
+            }
+        )
+        return len(located)
     
     async def run_etl(self):
         """Run the complete ETL process"""
@@ -517,6 +556,11 @@ class HealthcareDataETL:
             # Initialize database
             await self.initialize_database()
             
+            # Use the full ZIP code table for geocoding when one is configured
+            if geo.ZIP_COORDINATES_CSV:
+                count = geo.load_zip_coordinates(geo.ZIP_COORDINATES_CSV)
+                logger.info(f"Loaded {count} ZIP code coordinates from {geo.ZIP_COORDINATES_CSV}")
+            
             # Read CSV file
             logger.info(f"Reading CSV file: {self.csv_path}")
             if not os.path.exists(self.csv_path):
@@ -528,102 +572,69 @@ class HealthcareDataETL:
             batch_count = 0
             
             async with self.session_factory() as session:
+                # Push the NY filter and column projection into polars so
+                # non-NY rows and unused columns never reach Python. Text
+                # columns are read as strings (keeps leading zeros in codes);
+                # undecodable bytes are replaced and unparseable numbers
+                # become null rather than failing the run. The streaming
+                # engine parses the file in parallel across all cores
+                # with bounded memory
+                ny_providers = (
+                    pl.scan_csv(
+                        self.csv_path,
+                        infer_schema=False,
+                        schema_overrides=CSV_SCHEMA_OVERRIDES,
+                        encoding='utf8-lossy',
+                        ignore_errors=True
+                    )
+                    .filter(pl.col('Rndrng_Prvdr_State_Abrvtn').str.strip_chars().str.to_uppercase() == 'NY')
+                    .select(CSV_COLUMNS)
+                )
+                records = self.clean_records(ny_providers).collect(engine='streaming')
+                logger.info(f"Found {len(records)} NY provider records")
+                
+                skipped = len(records) - records['is_valid'].sum()
+                if skipped:
+                    logger.warning(f"Skipping {skipped} rows with missing provider, procedure or financial data")
+                    total_errors += skipped
+                records = records.filter(pl.col('is_valid')).drop('is_valid')
+                
+                # The initial load is one transaction (its staging tables live
+                # until commit); re-runs commit batch by batch
                 async with session.begin():
-                    # Read CSV in chunks to handle large files
-                    # Try different encodings to handle various file formats
-                    encodings_to_try = ['latin-1', 'cp1252', 'iso-8859-1', 'utf-8']
-                    chunk_iter = None
-                    
-                    for encoding in encodings_to_try:
-                        try:
-                            # Test with a small chunk first
-                            test_chunk = pd.read_csv(
-                                self.csv_path,
-                                nrows=10,
-                                low_memory=False,
-                                dtype=str,
-                                encoding=encoding,
-                                on_bad_lines='skip'  # Skip problematic lines
-                            )
-                            logger.info(f"Successfully tested CSV with encoding: {encoding}")
-                            
-                            # If test successful, create the full chunk iterator
-                            chunk_iter = pd.read_csv(
-                                self.csv_path,
-                                chunksize=self.batch_size,
-                                low_memory=False,
-                                dtype=str,
-                                encoding=encoding,
-                                on_bad_lines='skip'  # Skip problematic lines
-                            )
-                            break
-                        except UnicodeDecodeError as e:
-                            logger.warning(f"Failed to read CSV with encoding: {encoding} - {e}")
-                            continue
-                        except Exception as e:
-                            logger.warning(f"Error testing encoding {encoding}: {e}")
-                            continue
-                    
-                    if chunk_iter is None:
-                        # Fallback: try with error handling
-                        logger.warning("All encodings failed, trying with error handling...")
-                        try:
-                            chunk_iter = pd.read_csv(
-                                self.csv_path,
-                                chunksize=self.batch_size,
-                                low_memory=False,
-                                dtype=str,
-                                encoding='latin-1',  # Most permissive encoding
-                                on_bad_lines='skip',
-                                encoding_errors='replace'
-                            )
-                            logger.info("Successfully opened CSV with fallback method")
-                        except Exception as e:
-                            raise ValueError(f"Could not read CSV file with any method: {e}")
-                    
-                    for chunk in chunk_iter:
+                    initial_load = await self.is_initial_load(session)
+                    if initial_load:
+                        logger.info("Target tables are empty, bulk loading with COPY")
+                        total_processed = await self.bulk_load(session, records)
+                
+                if not initial_load:
+                    for chunk in records.iter_slices(self.batch_size):
                         batch_count += 1
                         logger.info(f"Processing batch {batch_count} ({len(chunk)} records)")
                         
                         try:
-                            # Convert chunk to list of dictionaries
-                            batch_data = chunk.to_dict('records')
-                            
-                            # Filter for NY providers only
-                            ny_batch_data = self.filter_ny_providers(batch_data)
-                            
-                            if not ny_batch_data:
-                                logger.info(f"Batch {batch_count}: No NY providers found, skipping")
-                                continue
-                            
-                            logger.info(f"Batch {batch_count}: Filtered to {len(ny_batch_data)} NY providers from {len(batch_data)} total records")
-                            
                             # Process batch
-                            processed, errors = await self.process_batch(session, ny_batch_data)
+                            processed, errors = await self.process_batch(session, chunk)
                             
                             total_processed += processed
                             total_errors += errors
                             
                             logger.info(f"Batch {batch_count} completed: {processed} processed, {errors} errors")
                             
-                        except UnicodeDecodeError as e:
-                            logger.error(f"Unicode decode error in batch {batch_count}: {e}")
-                            self.log_problematic_row_details(chunk, batch_count, e)
-                            
-                            # Skip this batch and continue
-                            logger.warning(f"Skipping batch {batch_count} due to encoding error")
-                            continue
-                            
                         except Exception as e:
                             logger.error(f"Unexpected error in batch {batch_count}: {e}")
                             self.log_problematic_row_details(chunk, batch_count, e)
+                            total_errors += len(chunk)
                             
                             # Skip this batch and continue
                             logger.warning(f"Skipping batch {batch_count} due to error")
                             continue
-                    
-                    # Commit all changes
-                    await session.commit()
+            
+                # Providers this CSV didn't touch keep NULL coordinates until geocoded here
+                async with session.begin():
+                    geocoded = await self.backfill_coordinates(session)
+                if geocoded:
+                    logger.info(f"Backfilled coordinates for {geocoded} providers")
             
             logger.info(f"ETL process completed successfully!")
             logger.info(f"Total records processed: {total_processed}")
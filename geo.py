@@ -0,0 +1,73 @@
+"""
+Geographic helpers shared by the API and the ETL
+
+Holds the ZIP code coordinate table used to geocode providers (ETL) and
+search locations (API). Distances themselves are computed in Postgres with
+earthdistance.
+"""
+
+import csv
+import os
+from typing import Optional
+
+import numpy as np
+
+ZIP_COORDINATES_CSV = os.getenv("ZIP_COORDINATES_CSV")
+
+# ZIP code coordinates, stored as parallel arrays (one float64 per coordinate)
+# so a batch of ZIP codes can be geocoded with a single array lookup. The
+# built-in table is a small NYC sample; set ZIP_COORDINATES_CSV to load a
+# full ZIP code database with load_zip_coordinates() at startup.
+zip_codes = [
+    "10001",  # NYC
+    "10002",  # NYC
+    "10003",  # NYC
+    "11201",  # Brooklyn
+    "11215",  # Brooklyn
+    "10451",  # Bronx
+    "11101",  # Queens
+    "10301",  # Staten Island
+]
+zip_lat = np.array(
+    [40.7505, 40.7174, 40.7323, 40.6943, 40.6622, 40.8200, 40.7505, 40.6415],
+    dtype=np.float64
+)
+zip_lon = np.array(
+    [-73.9934, -73.9897, -73.9894, -73.9903, -73.9874, -73.9200, -73.9400, -74.0776],
+    dtype=np.float64
+)
+zip_to_idx = {zip_code: i for i, zip_code in enumerate(zip_codes)}
+
+
+def load_zip_coordinates(csv_path: str) -> int:
+    """
+    Replace the ZIP code table with the contents of a CSV file
+    
+    Args:
+        csv_path: CSV with zip_code, latitude and longitude columns
+        
+    Returns:
+        Number of ZIP codes loaded
+    """
+    global zip_codes, zip_lat, zip_lon, zip_to_idx
+    
+    codes, lats, lons = [], [], []
+    with open(csv_path, newline="") as f:
+        for row in csv.DictReader(f):
+            codes.append(row["zip_code"].strip().zfill(5))
+            lats.append(float(row["latitude"]))
+            lons.append(float(row["longitude"]))
+    
+    zip_codes = codes
+    zip_lat = np.array(lats, dtype=np.float64)
+    zip_lon = np.array(lons, dtype=np.float64)
+    zip_to_idx = {zip_code: i for i, zip_code in enumerate(codes)}
+    return len(codes)
+
+
+def get_zip_coordinates(zip_code: str) -> Optional[tuple]:
+    """Get (latitude, longitude) for a ZIP code"""
+    idx = zip_to_idx.get(zip_code)
+    if idx is None:
+        return None
+    return float(zip_lat[idx]), float(zip_lon[idx])
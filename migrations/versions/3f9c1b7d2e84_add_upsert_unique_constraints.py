@@ -0,0 +1,60 @@
+"""add upsert unique constraints
+
+Revision ID: 3f9c1b7d2e84
+Revises: 8d3a6c0e5f21
+Create Date: 2025-09-02 15:02:17.441193
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c1b7d2e84'
+down_revision: Union[str, Sequence[str], None] = '8d3a6c0e5f21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Conflict targets for the ETL's INSERT ... ON CONFLICT upserts. The unique
+    # indexes are built CONCURRENTLY so reads and writes continue meanwhile;
+    # attaching them as constraints afterwards only takes a brief lock.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_procedures_ms_drg_code_unique', 'procedures', ['ms_drg_code'],
+            unique=True, postgresql_concurrently=True
+        )
+        op.drop_index(
+            op.f('ix_procedures_ms_drg_code'), table_name='procedures',
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            'uq_provider_procedure', 'provider_procedures', ['provider_id', 'procedure_id'],
+            unique=True, postgresql_concurrently=True
+        )
+        op.create_index(
+            'uq_rating_provider', 'ratings', ['provider_id'],
+            unique=True, postgresql_concurrently=True
+        )
+    
+    op.execute("ALTER INDEX ix_procedures_ms_drg_code_unique RENAME TO ix_procedures_ms_drg_code")
+    op.execute(
+        "ALTER TABLE provider_procedures "
+        "ADD CONSTRAINT uq_provider_procedure UNIQUE USING INDEX uq_provider_procedure"
+    )
+    op.execute(
+        "ALTER TABLE ratings "
+        "ADD CONSTRAINT uq_rating_provider UNIQUE USING INDEX uq_rating_provider"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_rating_provider', 'ratings', type_='unique')
+    op.drop_constraint('uq_provider_procedure', 'provider_procedures', type_='unique')
+    op.drop_index(op.f('ix_procedures_ms_drg_code'), table_name='procedures')
+    op.create_index(op.f('ix_procedures_ms_drg_code'), 'procedures', ['ms_drg_code'], unique=False)
@@ -0,0 +1,39 @@
+"""add provider coordinates
+
+Revision ID: 4b7e2f1c9a03
+Revises: 998b6ce72a60
+Create Date: 2025-09-02 10:41:27.518304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b7e2f1c9a03'
+down_revision: Union[str, Sequence[str], None] = '998b6ce72a60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # earthdistance provides ll_to_earth / earth_box / earth_distance
+    op.execute("CREATE EXTENSION IF NOT EXISTS cube")
+    op.execute("CREATE EXTENSION IF NOT EXISTS earthdistance")
+    op.add_column('providers', sa.Column('latitude', sa.Float(), nullable=True))
+    op.add_column('providers', sa.Column('longitude', sa.Float(), nullable=True))
+    # Existing rows keep NULL coordinates until the ETL is re-run
+    op.execute(
+        "CREATE INDEX providers_geo_idx ON providers "
+        "USING gist (ll_to_earth(latitude, longitude))"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('providers_geo_idx', table_name='providers')
+    op.drop_column('providers', 'longitude')
+    op.drop_column('providers', 'latitude')
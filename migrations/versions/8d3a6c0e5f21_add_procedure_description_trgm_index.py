@@ -0,0 +1,38 @@
+"""add procedure description trgm index
+
+Revision ID: 8d3a6c0e5f21
+Revises: 4b7e2f1c9a03
+Create Date: 2025-09-02 14:08:53.902617
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d3a6c0e5f21'
+down_revision: Union[str, Sequence[str], None] = '4b7e2f1c9a03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # provider_procedures(procedure_id / provider_id) and procedures(ms_drg_code)
+    # are already indexed by the initial schema
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        'procedures_desc_trgm',
+        'procedures',
+        ['ms_drg_description'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'ms_drg_description': 'gin_trgm_ops'}
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('procedures_desc_trgm', table_name='procedures')
@@ -0,0 +1,39 @@
+"""narrow total_discharges to smallint
+
+Revision ID: c5e8a2d91f47
+Revises: 3f9c1b7d2e84
+Create Date: 2025-09-02 15:41:08.276530
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e8a2d91f47'
+down_revision: Union[str, Sequence[str], None] = '3f9c1b7d2e84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column(
+        'provider_procedures', 'total_discharges',
+        existing_type=sa.Integer(),
+        type_=sa.SmallInteger(),
+        existing_nullable=False,
+        postgresql_using='total_discharges::smallint'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column(
+        'provider_procedures', 'total_discharges',
+        existing_type=sa.SmallInteger(),
+        type_=sa.Integer(),
+        existing_nullable=False
+    )
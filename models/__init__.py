@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Text
+from sqlalchemy import Column, Integer, SmallInteger, String, Float, ForeignKey, Text, Index, UniqueConstraint, func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
@@ -14,10 +14,21 @@ class Provider(Base):
     provider_city = Column(String, nullable=False)
     provider_state = Column(String, nullable=False)
     provider_zip_code = Column(String, nullable=False)
+    latitude = Column(Float, nullable=True)  # NULL when the ZIP code could not be geocoded
+    longitude = Column(Float, nullable=True)
     
     # Relationships
     provider_procedures = relationship("ProviderProcedure", back_populates="provider")
     ratings = relationship("Rating", back_populates="provider")
+    
+    __table_args__ = (
+        # Spatial index for earth_box radius searches (requires cube + earthdistance)
+        Index(
+            "providers_geo_idx",
+            func.ll_to_earth(latitude, longitude),
+            postgresql_using="gist"
+        ),
+    )
 
 
 class Procedure(Base):
@@ -25,11 +36,21 @@ class Procedure(Base):
     __tablename__ = "procedures"
     
     id = Column(Integer, primary_key=True, autoincrement=True, index=True)
-    ms_drg_code = Column(String, nullable=False, index=True)
+    ms_drg_code = Column(String, nullable=False, unique=True, index=True)
     ms_drg_description = Column(Text, nullable=False)
     
     # Relationships
     provider_procedures = relationship("ProviderProcedure", back_populates="procedure")
+    
+    __table_args__ = (
+        # Trigram index so ILIKE '%...%' description searches avoid a sequential scan
+        Index(
+            "procedures_desc_trgm",
+            ms_drg_description,
+            postgresql_using="gin",
+            postgresql_ops={"ms_drg_description": "gin_trgm_ops"}
+        ),
+    )
 
 
 class ProviderProcedure(Base):
@@ -39,7 +60,7 @@ class ProviderProcedure(Base):
     id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     provider_id = Column(String, ForeignKey("providers.provider_id"), nullable=False, index=True)
     procedure_id = Column(Integer, ForeignKey("procedures.id"), nullable=False, index=True)
-    total_discharges = Column(Integer, nullable=False)
+    total_discharges = Column(SmallInteger, nullable=False)  # CMS per-DRG counts stay far below 32767
     average_covered_charges = Column(Float, nullable=False)
     average_total_payments = Column(Float, nullable=False)
     average_medicare_payments = Column(Float, nullable=False)
@@ -47,6 +68,11 @@ class ProviderProcedure(Base):
     # Relationships
     provider = relationship("Provider", back_populates="provider_procedures")
     procedure = relationship("Procedure", back_populates="provider_procedures")
+    
+    __table_args__ = (
+        # Conflict target for the ETL's bulk upserts
+        UniqueConstraint("provider_id", "procedure_id", name="uq_provider_procedure"),
+    )
 
 
 class Rating(Base):
@@ -59,3 +85,8 @@ class Rating(Base):
     
     # Relationships
     provider = relationship("Provider", back_populates="ratings")
+    
+    __table_args__ = (
+        # One rating per provider; conflict target for the ETL's bulk upserts
+        UniqueConstraint("provider_id", name="uq_rating_provider"),
+    )